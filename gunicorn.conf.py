@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+"""
+Gunicorn配置文件
+生产环境下以多个UvicornWorker进程运行FastAPI应用，绕开GIL对并发请求的限制
+
+启动方式：gunicorn main:app
+"""
+
+import multiprocessing
+import os
+
+# 监听地址
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# 工作进程数，默认 2 * CPU核数 + 1
+workers = int(os.getenv("WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+# 使用uvicorn的ASGI worker（uvloop + httptools）
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# LLM调用耗时较长，放宽超时时间
+timeout = int(os.getenv("TIMEOUT", 300))
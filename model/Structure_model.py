@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Any
 from enum import Enum
-from pydantic import BaseModel, Field
+from typing_extensions import TypedDict, Annotated, Required
+from pydantic import BaseModel, Field, ValidationError
 
 class SeverityLevel(str, Enum):
     mild = "mild"
@@ -9,56 +10,57 @@ class SeverityLevel(str, Enum):
 
 # ======================
 # 核心实体模型
+# 叶子实体使用TypedDict，由顶层模型统一校验结构，避免为每个实体构造模型实例
 # ======================
 
-class BearingFaultType(BaseModel):
+class BearingFaultType(TypedDict, total=False):
     """轴承故障类型实体"""
-    name: str = Field(..., description="故障类型名称，如'疲劳剥落'、'磨损'、'胶合'等")
-    severity: Optional[SeverityLevel] = Field(None, description="故障严重程度")
-    caused_by: List[str] = Field(default_factory=list, description="导致该故障的原因列表（关联FaultCause.name）")
-    manifests_as: List[str] = Field(default_factory=list, description="在信号中的表现形式（关联SignalFeature.name）")
-    has_feature_frequency: List[str] = Field(default_factory=list, description="对应的特征频率（关联CharacteristicFrequency.name）")
-    detected_by: List[str] = Field(default_factory=list, description="可检测该故障的诊断方法（关联DiagnosisMethod.name")
+    name: Required[Annotated[str, Field(description="故障类型名称，如'疲劳剥落'、'磨损'、'胶合'等")]]
+    severity: Annotated[Optional[SeverityLevel], Field(description="故障严重程度")]
+    caused_by: Annotated[List[str], Field(description="导致该故障的原因列表（关联FaultCause.name）")]
+    manifests_as: Annotated[List[str], Field(description="在信号中的表现形式（关联SignalFeature.name）")]
+    has_feature_frequency: Annotated[List[str], Field(description="对应的特征频率（关联CharacteristicFrequency.name）")]
+    detected_by: Annotated[List[str], Field(description="可检测该故障的诊断方法（关联DiagnosisMethod.name")]
 
 
-class FaultCause(BaseModel):
+class FaultCause(TypedDict, total=False):
     """故障原因实体"""
-    name: str = Field(..., description="原因名称，如'润滑不良'、'超负荷'、'装配不当'等")
-    produces: List[str] = Field(default_factory=list, description="该原因导致的故障类型（关联BearingFaultType.name）")
-    effect_description: Optional[str] = Field(None, description="对振动或诊断的具体影响描述")
+    name: Required[Annotated[str, Field(description="原因名称，如'润滑不良'、'超负荷'、'装配不当'等")]]
+    produces: Annotated[List[str], Field(description="该原因导致的故障类型（关联BearingFaultType.name）")]
+    effect_description: Annotated[Optional[str], Field(description="对振动或诊断的具体影响描述")]
 
 
-class SignalFeature(BaseModel):
+class SignalFeature(TypedDict, total=False):
     """故障特征信号实体"""
-    name: str = Field(..., description="信号特征名称，如'周期性冲击'、'边频带'、'包络调制'等")
-    frequency_band: Optional[str] = Field(None, description="所属频段，如'高频（10–60 kHz）'")
-    associated_faults: List[str] = Field(default_factory=list, description="关联的故障类型（BearingFaultType.name）")
-    influenced_by: List[str] = Field(default_factory=list, description="受哪些影响因素干扰（关联InfluencingFactor.name）")
+    name: Required[Annotated[str, Field(description="信号特征名称，如'周期性冲击'、'边频带'、'包络调制'等")]]
+    frequency_band: Annotated[Optional[str], Field(description="所属频段，如'高频（10–60 kHz）'")]
+    associated_faults: Annotated[List[str], Field(description="关联的故障类型（BearingFaultType.name）")]
+    influenced_by: Annotated[List[str], Field(description="受哪些影响因素干扰（关联InfluencingFactor.name）")]
 
 
-class CharacteristicFrequency(BaseModel):
+class CharacteristicFrequency(TypedDict, total=False):
     """特征频率实体"""
-    name: str = Field(..., description="频率名称，如'外圈通过频率'、'滚动体自转频率'等")
-    formula: Optional[str] = Field(None, description="计算公式，如 'f_outer = (Z/2) * f0 * (1 - d/D * cosα)'")
-    depends_on: List[str] = Field(default_factory=list, description="依赖的参数，如['轴转频 f0', '滚动体数 Z', ...]")
-    associated_fault: Optional[str] = Field(None, description="对应的故障类型（BearingFaultType.name）")
+    name: Required[Annotated[str, Field(description="频率名称，如'外圈通过频率'、'滚动体自转频率'等")]]
+    formula: Annotated[Optional[str], Field(description="计算公式，如 'f_outer = (Z/2) * f0 * (1 - d/D * cosα)'")]
+    depends_on: Annotated[List[str], Field(description="依赖的参数，如['轴转频 f0', '滚动体数 Z', ...]")]
+    associated_fault: Annotated[Optional[str], Field(description="对应的故障类型（BearingFaultType.name）")]
 
 
-class DiagnosisMethod(BaseModel):
+class DiagnosisMethod(TypedDict, total=False):
     """诊断方法实体"""
-    name: str = Field(..., description="方法名称，如'共振解调'、'小波分析'、'包络分析'等")
-    frequency_band: Optional[str] = Field(None, description="适用频段")
-    advantage: Optional[str] = Field(None, description="方法优势")
-    limitation: Optional[str] = Field(None, description="方法局限性")
-    detects_faults: List[str] = Field(default_factory=list, description="可检测的故障类型（BearingFaultType.name）")
-    influenced_by: List[str] = Field(default_factory=list, description="受哪些因素影响（InfluencingFactor.name）")
+    name: Required[Annotated[str, Field(description="方法名称，如'共振解调'、'小波分析'、'包络分析'等")]]
+    frequency_band: Annotated[Optional[str], Field(description="适用频段")]
+    advantage: Annotated[Optional[str], Field(description="方法优势")]
+    limitation: Annotated[Optional[str], Field(description="方法局限性")]
+    detects_faults: Annotated[List[str], Field(description="可检测的故障类型（BearingFaultType.name）")]
+    influenced_by: Annotated[List[str], Field(description="受哪些因素影响（InfluencingFactor.name）")]
 
 
-class InfluencingFactor(BaseModel):
+class InfluencingFactor(TypedDict, total=False):
     """影响因素实体"""
-    name: str = Field(..., description="因素名称，如'转速'、'测点位置'、'润滑状态'等")
-    effect_description: Optional[str] = Field(None, description="对诊断或信号的具体影响")
-    influences: List[str] = Field(default_factory=list, description="影响的实体，如诊断方法、信号特征等（通过名称关联）")
+    name: Required[Annotated[str, Field(description="因素名称，如'转速'、'测点位置'、'润滑状态'等")]]
+    effect_description: Annotated[Optional[str], Field(description="对诊断或信号的具体影响")]
+    influences: Annotated[List[str], Field(description="影响的实体，如诊断方法、信号特征等（通过名称关联）")]
 
 
 # ======================
@@ -88,6 +90,8 @@ class BearingFaultKnowledgeGraph(BaseModel):
 
 import json
 
+_json_decoder = json.JSONDecoder()
+
 # ======================
 # JSON输出解析器
 # ======================
@@ -96,35 +100,46 @@ class JsonOutputParser:
     """JSON输出解析器"""
     def __init__(self, pydantic_object):
         self.pydantic_object = pydantic_object
+        # 模式说明只依赖模型定义，初始化时生成一次即可
+        self._format_instructions = json.dumps(
+            pydantic_object.model_json_schema(), indent=2, ensure_ascii=False
+        )
     
     def parse(self, text: str):
-        """解析LLM返回的JSON格式输出"""
-        import re
-        
-        try:
-            # 尝试直接解析JSON
-            data = json.loads(text)
-            return self.pydantic_object(**data)
-        except json.JSONDecodeError:
-            # 如果直接解析失败，尝试从文本中提取JSON部分
-            # 查找第一个 '{' 和最后一个 '}' 之间的内容
-            match = re.search(r'\{.*\}', text, re.DOTALL)
-            if match:
-                try:
-                    json_str = match.group(0)
-                    data = json.loads(json_str)
-                    return self.pydantic_object(**data)
-                except json.JSONDecodeError:
-                    pass
-            
-            # 如果解析失败，返回空的知识图谱
+        """解析LLM返回的JSON格式输出，解析失败时返回空的知识图谱"""
+        result = self.try_parse(text)
+        if result is None:
             return self.pydantic_object(entries=[])
+        return result
+    
+    def try_parse(self, text: str):
+        """解析LLM返回的JSON格式输出，未能得到通过校验的结果时返回None"""
+        try:
+            # 尝试直接解析JSON，解析与校验一次完成
+            return self.pydantic_object.model_validate_json(text)
+        except ValidationError:
+            pass
+        
+        # 如果直接解析失败，从每个 '{' 处尝试解码出完整的JSON对象
+        # 未通过校验的对象（如模型复述的模式或示例）跳过，从下一个 '{' 继续查找，
+        # 以便仍能找到嵌套在外层包装对象中的结果
+        i = text.find('{')
+        while i != -1:
+            try:
+                data, _ = _json_decoder.raw_decode(text, i)
+            except json.JSONDecodeError:
+                i = text.find('{', i + 1)
+                continue
+            try:
+                return self.pydantic_object.model_validate(data)
+            except ValidationError:
+                i = text.find('{', i + 1)
+        
+        return None
     
     def get_format_instructions(self):
         """获取格式说明"""
-        # 生成Pydantic模型的JSON模式
-        schema = self.pydantic_object.model_json_schema()
-        return json.dumps(schema, indent=2, ensure_ascii=False)
+        return self._format_instructions
 
 # 创建解析器实例（可直接用于 LLM 输出解析）
 parser = JsonOutputParser(pydantic_object=BearingFaultKnowledgeGraph)
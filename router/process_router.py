@@ -1,10 +1,11 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, BackgroundTasks, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse
 from typing import List
 import os
+import asyncio
 import tempfile
-import shutil
+import aiofiles
 from server.document_processor import DocumentProcessor
 
 router = APIRouter()
@@ -17,18 +18,17 @@ async def read_root():
     """返回前端页面"""
     frontend_path = os.path.join(os.path.dirname(__file__), "frontend.html")
     if os.path.exists(frontend_path):
-        with open(frontend_path, "r", encoding="utf-8") as file:
-            html_content = file.read()
-        return HTMLResponse(content=html_content, status_code=200)
+        return FileResponse(frontend_path, media_type="text/html")
     else:
         return HTMLResponse(content="<h1>Frontend page not found</h1>", status_code=404)
 
 @router.post("/process-document/")
-async def process_document(file: UploadFile = File(...)):
+async def process_document(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     处理上传的文档文件
     
     Args:
+        background_tasks: 响应发送后执行的后台任务
         file: 上传的文档文件
         
     Returns:
@@ -42,29 +42,44 @@ async def process_document(file: UploadFile = File(...)):
     if file_extension not in supported_extensions:
         raise HTTPException(status_code=400, detail=f"不支持的文件类型: {file_extension}。支持的格式: {supported_extensions}")
     
-    # 创建临时文件
+    # 纯文本格式可直接在内存中解码，无需写入临时文件
+    text_extensions = [".md", ".txt"]
+    
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-            shutil.copyfileobj(file.file, tmp_file)
-            tmp_file_path = tmp_file.name
-        
-        # 处理文档
-        result = processor.process_document(tmp_file_path)
-        
-        # 清理临时文件
-        os.unlink(tmp_file_path)
+        if file_extension in text_extensions:
+            raw = await file.read()
+            # 与文本模式open()一致，统一换行符，保证Windows换行的段落也能被正确识别
+            text = raw.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+            result = await processor.process_text(text)
+        else:
+            # 创建临时文件（python-docx需要文件路径）
+            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
+                tmp_file_path = tmp_file.name
+            
+            # 分块异步写入上传内容，避免阻塞事件循环
+            async with aiofiles.open(tmp_file_path, 'wb') as f:
+                while chunk := await file.read(1 << 20):
+                    await f.write(chunk)
+            
+            # 处理文档（解析在线程池中执行，LLM调用为异步）
+            result = await processor.process_document(tmp_file_path)
+            
+            # 响应发送后再清理临时文件
+            background_tasks.add_task(os.unlink, tmp_file_path)
         
         # 返回结果
         return {
             "filename": file.filename,
             "text_content": result["text_content"],
-            "chunks": result["chunks"],
-            "knowledge_graph": result["knowledge_graph"]  # 注意：这里可能需要序列化处理
+            # 文本块以 [起始, 结束) 位置表示，由前端从text_content中切片得到
+            "chunk_spans": result["chunk_spans"],
+            # 预先转换为普通dict，orjson可直接编码
+            "knowledge_graph": [kg.model_dump(mode='json') for kg in result["knowledge_graph"]]
         }
     except Exception as e:
-        # 确保临时文件被清理
+        # 确保临时文件被清理（抛出异常时后台任务不会执行，需在此处清理）
         if 'tmp_file_path' in locals():
-            os.unlink(tmp_file_path)
+            await asyncio.to_thread(os.unlink, tmp_file_path)
         raise HTTPException(status_code=500, detail=f"处理文档时出错: {str(e)}")
 
 @router.get("/health")
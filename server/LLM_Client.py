@@ -7,12 +7,15 @@ LLM客户端模块
 """
 
 import os
+import asyncio
+import httpx
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
+from pydantic import ValidationError
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langchain_community.callbacks.manager import get_openai_callback
-from model.Structure_model import BearingFaultKnowledgeGraph, parser
+from model.Structure_model import BearingFaultKnowledgeGraph, parser, format_instructions
 
 # 加载.env文件中的环境变量
 load_dotenv()
@@ -21,7 +24,8 @@ load_dotenv()
 class LLMClient:
     """LLM客户端类"""
     
-    def __init__(self, model_name: str = "", temperature: float = 0.4, base_url: str = ""):
+    def __init__(self, model_name: str = "", temperature: float = 0.4, base_url: str = "",
+                 max_attempts: int = 2):
         """
         初始化LLM客户端
         
@@ -29,6 +33,7 @@ class LLMClient:
             model_name: 使用的模型名称
             temperature: 生成文本的随机性参数
             base_url: API的基础URL
+            max_attempts: 输出未通过结构校验时的最大尝试次数
         """
         # 从环境变量获取配置参数
         api_key = os.getenv("API_KEY")
@@ -50,9 +55,22 @@ class LLMClient:
         if model_name:
             model_kwargs["model_name"] = model_name
         
-        self.model = ChatOpenAI(**model_kwargs)
+        # 并发处理文本块时共享同一个连接池
+        model_kwargs["http_async_client"] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32)
+        )
+        
+        chat_model = ChatOpenAI(**model_kwargs)
+        # 实际使用的模型名称（用于提取结果缓存的键）
+        self.model_name = chat_model.model_name
+        self.max_attempts = max_attempts
+        
+        # 由服务端按知识图谱结构约束输出，include_raw保留原始响应以便校验失败时重试
+        self.model = chat_model.with_structured_output(
+            BearingFaultKnowledgeGraph, method="json_schema", include_raw=True
+        )
     
-    def extract_knowledge_graph(self, prompt: str) -> BearingFaultKnowledgeGraph:
+    async def extract_knowledge_graph(self, prompt: str) -> BearingFaultKnowledgeGraph:
         """
         通过LLM从提示词中提取知识图谱数据
         
@@ -69,19 +87,36 @@ class LLMClient:
                 HumanMessage(content=prompt)
             ]
             
-            # 调用LLM并获取响应
-            with get_openai_callback() as cb:
-                response = self.model.invoke(messages)
-                print(f"LLM调用成本: {cb.total_cost} USD")
+            for attempt in range(self.max_attempts):
+                # 异步调用LLM并获取响应，等待期间让出事件循环
+                with get_openai_callback() as cb:
+                    response = await self.model.ainvoke(messages)
+                    print(f"LLM调用成本: {cb.total_cost} USD")
+                
+                if response["parsed"] is not None:
+                    return response["parsed"]
+                
+                if attempt + 1 < self.max_attempts:
+                    # 将校验错误反馈给模型后重试
+                    error = response["parsing_error"]
+                    detail = error.errors() if isinstance(error, ValidationError) else error
+                    messages = [
+                        SystemMessage(content="你是一个专业的知识图谱构建助手。"),
+                        HumanMessage(content=f"{prompt}\n\n上一次输出未通过结构校验，请修正以下错误后重新输出：\n{detail}")
+                    ]
+                    await asyncio.sleep(1.0 * (attempt + 1))
             
-            # 解析响应为结构化数据
-            kg_data = parser.parse(response.content)
+            # 多次尝试仍未通过校验，退回到从原始文本中解析；仍失败则报错，
+            # 避免把空结果当作有效提取结果（例如被写入缓存）
+            kg_data = parser.try_parse(response["raw"].content)
+            if kg_data is None:
+                raise ValueError("LLM输出未通过知识图谱结构校验")
             return kg_data
             
         except Exception as e:
             raise Exception(f"LLM处理失败: {str(e)}")
     
-    def process_text_chunk(self, text_chunk: str, context_info: Optional[str] = None) -> BearingFaultKnowledgeGraph:
+    async def process_text_chunk(self, text_chunk: str, context_info: Optional[str] = None) -> BearingFaultKnowledgeGraph:
         """
         处理单个文本块，提取知识图谱数据
         
@@ -92,8 +127,6 @@ class LLMClient:
         Returns:
             结构化的知识图谱数据
         """
-        from Structure_model import format_instructions
-        
         # 构建提示词
         prompt = f"""你是一个专业的知识图谱构建助手。你的任务是从技术文档中提取结构化的轴承故障相关信息，
 并将它们组织成知识图谱的形式。
@@ -125,13 +158,13 @@ class LLMClient:
 """
         
         # 调用LLM提取知识图谱
-        return self.extract_knowledge_graph(prompt)
+        return await self.extract_knowledge_graph(prompt)
 
 
 # 使用示例
 if __name__ == "__main__":
     # 使用示例（需要设置OPENAI_API_KEY环境变量）
     # client = LLMClient()
-    # result = client.process_text_chunk("轴承在运行过程中出现过热现象，这通常是由于润滑不良导致的。")
+    # result = asyncio.run(client.process_text_chunk("轴承在运行过程中出现过热现象，这通常是由于润滑不良导致的。"))
     # print(result)
     pass
\ No newline at end of file
@@ -7,30 +7,89 @@
 """
 
 import os
+import re
+import asyncio
 import tempfile
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
 # 从现有模块导入知识图谱模型
 from model.Structure_model import BearingFaultKnowledgeGraph, parser, format_instructions
+from server.extraction_cache import ExtractionCache
+from server.LLM_Client import LLMClient
+
+# 提示词版本号，修改提示词模板时需要递增，使旧的提取缓存失效
+PROMPT_VERSION = "2"
+
+# 句子匹配：非结束符序列加上可选的句子结束符（句号、感叹号、问号等）
+_SENT_RE = re.compile(r'[^.!?。！？]+[.!?。！？]?', re.DOTALL)
+
+# 段落匹配：由空行（连续两个换行）分隔的非空文本
+_PARA_RE = re.compile(r'[^\n]+(?:\n(?!\n)[^\n]+)*')
+
+# 提示词固定前缀（任务说明与输出格式），模块加载时构建一次
+_PROMPT_PREFIX = f"""你是一个专业的知识图谱构建助手。你的任务是从技术文档中提取结构化的轴承故障相关信息，
+并将它们组织成知识图谱的形式。
+
+请仔细阅读以下文档片段，并提取其中的轴承故障相关信息。你需要识别：
+1. 轴承故障类型及其属性（名称、严重程度等）
+2. 故障原因及其影响
+3. 故障在信号中的表现形式
+4. 特征频率信息
+5. 诊断方法
+6. 影响因素
+
+请严格按照以下JSON格式输出，不要添加任何额外的文字说明：
+
+{format_instructions}
+
+文档内容：
+"""
+
+# 每个工作进程共享一个LLM客户端，复用其HTTP连接池
+_llm_client = None
+
+
+def _get_llm_client():
+    """获取（首次调用时创建）进程内共享的LLM客户端"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient()
+    return _llm_client
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """去除片段首尾的空白字符，返回调整后的起止位置"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
 
 class DocumentProcessor:
     """文档处理器主类"""
     
-    def __init__(self, max_context_length: int = 3000):
+    def __init__(self, max_context_length: int = 3000, max_concurrency: int = 8,
+                 cache_dir: Optional[str] = None):
         self.parsers = {
             '.md': MarkdownParser(),
             '.txt': TextParser(),
             '.docx': WordParser(),
         }
         self.max_context_length = max_context_length  # LLM最大上下文长度限制
+        self.max_concurrency = max_concurrency  # 并发LLM请求数上限，避免触发接口限流
+        # 同一处理器的所有请求共享该信号量（首次使用时在事件循环中创建）
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # LLM提取结果缓存，相同文本块重复上传时无需再次调用LLM
+        cache_dir = cache_dir or os.getenv("EXTRACTION_CACHE_DIR", ".cache/extraction")
+        self.cache = ExtractionCache(cache_dir, PROMPT_VERSION)
     
     def add_parser(self, extension: str, parser: 'DocumentParser'):
         """添加新的文档解析器"""
         self.parsers[extension] = parser
     
-    def process_document(self, file_path: str) -> Dict[str, Any]:
+    async def process_document(self, file_path: str) -> Dict[str, Any]:
         """
         处理文档的主入口函数
         
@@ -55,25 +114,43 @@ class DocumentProcessor:
         parser = self.parsers[ext]
         
         try:
-            # 3. 解析文档内容
-            text_content = parser.parse(file_path)
+            # 3. 解析文档内容（阻塞IO，放到线程池中执行）
+            text_content = await asyncio.to_thread(parser.parse, file_path)
+        except Exception as e:
+            raise Exception(f"处理文档时出错: {str(e)}")
+        
+        # 4. 分块并提取知识图谱数据
+        result = await self.process_text(text_content)
+        return {"original_file": file_path, **result}
+    
+    async def process_text(self, text_content: str) -> Dict[str, Any]:
+        """
+        处理已解析的纯文本内容，跳过文件解析步骤
+        
+        Args:
+            text_content: 文档的纯文本内容
             
-            # 4. 如果文本过长，进行分块处理
-            chunks = self._chunk_text(text_content)
+        Returns:
+            包含文本内容、分块位置和知识图谱数据的字典
+        """
+        try:
+            # 如果文本过长，进行分块处理
+            chunk_spans = await asyncio.to_thread(self._chunk_spans, text_content)
+            chunks = [text_content[start:end] for start, end in chunk_spans]
             
-            # 5. 通过LLM提取知识图谱数据
-            kg_data = self._extract_knowledge_graph(chunks)
+            # 通过LLM提取知识图谱数据
+            kg_data = await self._extract_knowledge_graph(chunks)
             
+            # 只返回分块位置，避免在结果中重复一份文本内容
             return {
-                "original_file": file_path,
                 "text_content": text_content,
-                "chunks": chunks,
+                "chunk_spans": chunk_spans,
                 "knowledge_graph": kg_data
             }
         except Exception as e:
             raise Exception(f"处理文档时出错: {str(e)}")
     
-    def _chunk_text(self, text: str) -> List[str]:
+    def _chunk_spans(self, text: str) -> List[Tuple[int, int]]:
         """
         将长文本分块，确保每块不超过最大上下文长度，同时尽量保持语义完整性
         
@@ -81,85 +158,58 @@ class DocumentProcessor:
             text: 原始文本内容
             
         Returns:
-            分块后的文本列表
+            各文本块在原文中的 (起始位置, 结束位置) 列表
         """
         if len(text) <= self.max_context_length:
-            return [text]
+            return [(0, len(text))]
         
-        # 按段落和句子进行分割
-        paragraphs = text.split('\n\n')  # 先按段落分割
-        chunks = []
-        current_chunk = ""
+        spans = []
+        # 只记录当前块在原文中的起止位置，块内容即原文切片，无需拼接字符串
+        chunk_start = chunk_end = None
         
-        for paragraph in paragraphs:
-            # 如果段落本身就很短，尝试合并
-            if len(paragraph) < 100:
-                if len(current_chunk) + len(paragraph) <= self.max_context_length:
-                    current_chunk += "\n\n" + paragraph
-                    continue
-                else:
-                    # 保存当前块并开始新块
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = paragraph
-                    continue
+        # 先按段落分割，逐个匹配，不生成完整的段落列表
+        for match in _PARA_RE.finditer(text):
+            para_start, para_end = match.span()
             
-            # 如果段落太大，需要进一步分割
-            if len(paragraph) > self.max_context_length:
-                # 按句子分割
-                sentences = self._split_sentences(paragraph)
-                for sentence in sentences:
-                    if len(current_chunk) + len(sentence) <= self.max_context_length:
-                        current_chunk += " " + sentence
-                    else:
-                        # 保存当前块并开始新块
-                        if current_chunk:
-                            chunks.append(current_chunk.strip())
-                        current_chunk = sentence
+            # 如果段落太大，需要按句子进一步分割
+            if para_end - para_start > self.max_context_length:
+                pieces = self._split_sentences(text, para_start, para_end)
             else:
-                # 段落大小适中
-                if len(current_chunk) + len(paragraph) <= self.max_context_length:
-                    current_chunk += "\n\n" + paragraph
+                pieces = [(para_start, para_end)]
+            
+            for start, end in pieces:
+                if chunk_start is not None and end - chunk_start <= self.max_context_length:
+                    chunk_end = end
                 else:
                     # 保存当前块并开始新块
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = paragraph
+                    if chunk_start is not None:
+                        spans.append(_strip_span(text, chunk_start, chunk_end))
+                    chunk_start, chunk_end = start, end
         
         # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-            
-        return chunks
+        if chunk_start is not None:
+            spans.append(_strip_span(text, chunk_start, chunk_end))
+        
+        # 忽略只包含空白的块
+        return [(start, end) for start, end in spans if start < end]
     
-    def _split_sentences(self, text: str) -> List[str]:
+    def _split_sentences(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
         """
         智能分割句子，考虑多种句子结束符
         
         Args:
-            text: 需要分割的文本
+            text: 原始文本内容
+            start: 需要分割的片段起始位置
+            end: 需要分割的片段结束位置
             
         Returns:
-            句子列表
+            各句子在原文中的 (起始位置, 结束位置) 列表
         """
-        import re
-        # 使用正则表达式分割句子，考虑句号、感叹号、问号等
-        sentences = re.split(r'[.!?。！？]', text)
-        # 清理句子并添加回标点符号
-        cleaned_sentences = []
-        punctuation_marks = re.findall(r'[.!?。！？]', text)
-        
-        for i, sentence in enumerate(sentences):
-            if sentence.strip():  # 忽略空句子
-                cleaned_sentence = sentence.strip()
-                # 添加回标点符号（如果不是最后一句）
-                if i < len(punctuation_marks):
-                    cleaned_sentence += punctuation_marks[i]
-                cleaned_sentences.append(cleaned_sentence)
-                
-        return cleaned_sentences if cleaned_sentences else [text]
+        # 单次扫描，每个匹配即为带结束符的完整句子，忽略空句子
+        sentences = [m.span() for m in _SENT_RE.finditer(text, start, end) if m.group(0).strip()]
+        return sentences or [(start, end)]
     
-    def _extract_knowledge_graph(self, chunks: List[str]) -> List[BearingFaultKnowledgeGraph]:
+    async def _extract_knowledge_graph(self, chunks: List[str]) -> List[BearingFaultKnowledgeGraph]:
         """
         通过LLM从文本块中提取知识图谱数据
         
@@ -169,118 +219,67 @@ class DocumentProcessor:
         Returns:
             知识图谱数据列表
         """
-        # 导入LLM客户端
+        # 获取LLM客户端
         try:
-            from server.LLM_Client import LLMClient
-            llm_client = LLMClient()
+            llm_client = _get_llm_client()
         except Exception as e:
             print(f"警告: 无法初始化LLM客户端: {e}")
             print("将返回空的知识图谱结果")
             return []
         
-        # 为每个文本块调用LLM提取实体和关系
-        kg_results = []
-        previous_context = None
+        # 各文本块相互独立，不再串联上一个块的上下文，以便并发调用LLM
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
         
-        for i, chunk in enumerate(chunks):
-            try:
+        async def extract(i: int, chunk: str) -> BearingFaultKnowledgeGraph:
+            # 优先读取缓存
+            kg_data = await asyncio.to_thread(self.cache.get, chunk, llm_client.model_name)
+            if kg_data is not None:
+                print(f"文本块 {i+1}/{len(chunks)} 命中缓存")
+                return kg_data
+            
+            async with semaphore:
                 # 创建高效的提示词
-                prompt = self._create_efficient_prompt(chunk, previous_context)
+                prompt = self._create_efficient_prompt(chunk)
                 
                 # 调用LLM提取知识图谱
-                kg_data = llm_client.extract_knowledge_graph(prompt)
-                kg_results.append(kg_data)
-                
-                # 提取关键信息作为下一个块的上下文
-                previous_context = self._summarize_key_info(kg_data)
-                
+                kg_data = await llm_client.extract_knowledge_graph(prompt)
                 print(f"已处理文本块 {i+1}/{len(chunks)}")
-                
-            except Exception as e:
-                print(f"处理第 {i+1} 个文本块时出错: {e}")
-                # 即使某个块处理失败，也继续处理其他块
+            
+            try:
+                await asyncio.to_thread(self.cache.put, chunk, llm_client.model_name, kg_data)
+            except OSError as e:
+                print(f"警告: 写入提取缓存失败: {e}")
+            return kg_data
+        
+        results = await asyncio.gather(
+            *(extract(i, chunk) for i, chunk in enumerate(chunks)),
+            return_exceptions=True
+        )
+        
+        # 按原始顺序收集结果，即使某个块处理失败，也不影响其他块
+        kg_results = []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                print(f"处理第 {i+1} 个文本块时出错: {result}")
                 continue
+            kg_results.append(result)
         
         return kg_results
     
-    def _create_efficient_prompt(self, text_chunk: str, previous_context: Optional[str] = None) -> str:
+    def _create_efficient_prompt(self, text_chunk: str) -> str:
         """
-        创建高效的提示词，确保不超过上下文长度限制并保留重要上下文信息
+        创建高效的提示词，确保不超过上下文长度限制
         
         Args:
             text_chunk: 当前文本块
-            previous_context: 上下文信息（前一个块的关键信息摘要）
             
         Returns:
             构造好的提示词
         """
-        
-        # 构建基础提示词
-        base_prompt = f"""你是一个专业的知识图谱构建助手。你的任务是从技术文档中提取结构化的轴承故障相关信息，
-并将它们组织成知识图谱的形式。
-
-请仔细阅读以下文档片段，并提取其中的轴承故障相关信息。你需要识别：
-1. 轴承故障类型及其属性（名称、严重程度等）
-2. 故障原因及其影响
-3. 故障在信号中的表现形式
-4. 特征频率信息
-5. 诊断方法
-6. 影响因素
-
-请严格按照以下JSON格式输出，不要添加任何额外的文字说明：
-
-{format_instructions}
-
-文档内容：
-{text_chunk}
-
-"""
-        
-        # 如果有上下文信息，则添加上下文提示
-        if previous_context:
-            context_prompt = f"""
-重要上下文信息（请参考但不要重复提取）：
-{previous_context}
-
-请基于以上上下文信息和当前文档内容，提取新增的或不同的信息。
-"""
-            base_prompt += context_prompt
-        
-        return base_prompt
-    
-    def _summarize_key_info(self, kg_data: BearingFaultKnowledgeGraph) -> str:
-        """
-        从知识图谱数据中提取关键信息摘要，用于下一个文本块的上下文
-        
-        Args:
-            kg_data: 知识图谱数据
-            
-        Returns:
-            关键信息摘要
-        """
-        summary_parts = []
-        
-        # 提取已识别的实体类型和关键信息
-        for entry in kg_data.entries:
-            if entry.fault_type:
-                summary_parts.append(f"故障类型: {entry.fault_type.name}")
-            if entry.cause:
-                summary_parts.append(f"故障原因: {entry.cause.name}")
-            if entry.signal_feature:
-                summary_parts.append(f"信号特征: {entry.signal_feature.name}")
-            if entry.frequency:
-                summary_parts.append(f"特征频率: {entry.frequency.name}")
-            if entry.diagnosis_method:
-                summary_parts.append(f"诊断方法: {entry.diagnosis_method.name}")
-            if entry.influencing_factor:
-                summary_parts.append(f"影响因素: {entry.influencing_factor.name}")
-        
-        # 限制摘要长度以避免占用过多上下文
-        summary = "; ".join(summary_parts)
-        if len(summary) > 500:  # 限制摘要长度
-            summary = summary[:497] + "..."
-            
-        return summary if summary else "暂无关键信息"
+        # 固定前缀只构建一次，每次只拼接文本块
+        return _PROMPT_PREFIX + text_chunk + "\n\n"
 
 
 class DocumentParser(ABC):
@@ -327,11 +326,8 @@ class WordParser(DocumentParser):
         except ImportError:
             raise ImportError("请安装python-docx库: pip install python-docx")
         
-        doc = Document(file_path)
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        return '\n'.join(full_text)
+        # 跳过空段落；段落之间以空行分隔，以便分块时按段落切分
+        return '\n\n'.join(para.text for para in Document(file_path).paragraphs if para.text)
 
 
 # 使用示例
@@ -340,5 +336,5 @@ if __name__ == "__main__":
     processor = DocumentProcessor()
     
     # 处理文档示例（需要实际的文件路径）
-    # result = processor.process_document("path/to/your/document.md")
+    # result = asyncio.run(processor.process_document("path/to/your/document.md"))
     # print(result)
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+知识图谱提取缓存模块
+以 (模型名称, 提示词版本, 文本块内容) 的sha256为键，将LLM提取结果缓存到磁盘，避免重复调用LLM
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional
+from pydantic import ValidationError
+from model.Structure_model import BearingFaultKnowledgeGraph
+
+
+class ExtractionCache:
+    """基于内容寻址的知识图谱提取结果缓存"""
+
+    def __init__(self, cache_dir: str, prompt_version: str):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存文件存放目录
+            prompt_version: 提示词版本号，提示词变更后旧缓存自动失效
+        """
+        self.cache_dir = cache_dir
+        self.prompt_version = prompt_version
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, chunk: str, model_name: str) -> str:
+        """计算缓存键，每个字段都带长度前缀，避免拼接产生歧义"""
+        digest = hashlib.sha256()
+        for part in (chunk, model_name, self.prompt_version):
+            data = part.encode('utf-8')
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, chunk: str, model_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._key(chunk, model_name)}.json")
+
+    def get(self, chunk: str, model_name: str) -> Optional[BearingFaultKnowledgeGraph]:
+        """
+        读取缓存的提取结果
+
+        Args:
+            chunk: 文本块内容
+            model_name: 模型名称
+
+        Returns:
+            缓存命中时返回知识图谱数据，否则返回None
+        """
+        path = self._path(chunk, model_name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = f.read()
+        except (OSError, ValueError):
+            # 文件不存在、无法读取或编码损坏，均视为未命中
+            return None
+
+        try:
+            return BearingFaultKnowledgeGraph.model_validate_json(data)
+        except ValidationError:
+            # 数据结构已变更，淘汰旧缓存（其他进程可能已先行删除）
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+
+    def put(self, chunk: str, model_name: str, kg_data: BearingFaultKnowledgeGraph):
+        """
+        写入提取结果，先写临时文件再原子替换，避免并发读到不完整的内容
+
+        Args:
+            chunk: 文本块内容
+            model_name: 模型名称
+            kg_data: 知识图谱数据
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(kg_data.model_dump_json())
+            os.replace(tmp_path, self._path(chunk, model_name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
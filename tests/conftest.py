@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""测试公共夹具"""
+
+import asyncio
+
+import pytest
+
+from model.Structure_model import BearingFaultKnowledgeGraph
+from server import document_processor
+from server.document_processor import DocumentProcessor
+
+
+class FakeLLMClient:
+    """替代LLMClient，以文本块内容作为提取出的故障原因名称"""
+
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.chunks = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def extract_knowledge_graph(self, prompt: str) -> BearingFaultKnowledgeGraph:
+        chunk = prompt[len(document_processor._PROMPT_PREFIX):-2]
+        self.chunks.append(chunk)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if "失败" in chunk:
+            raise Exception("LLM处理失败: 模拟错误")
+        return BearingFaultKnowledgeGraph.model_validate({"entries": [{"cause": {"name": chunk}}]})
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    client = FakeLLMClient()
+    monkeypatch.setattr(document_processor, "_get_llm_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def processor(tmp_path):
+    return DocumentProcessor(max_context_length=60, cache_dir=str(tmp_path))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""文档处理模块测试"""
+
+import asyncio
+
+from server.document_processor import DocumentProcessor
+
+
+def _causes(result):
+    return [kg.entries[0].cause["name"] for kg in result["knowledge_graph"]]
+
+
+def test_failed_chunk_does_not_affect_others(processor, fake_llm):
+    paragraphs = [f"第{i}段：轴承外圈出现疲劳剥落，需要检查润滑状态并记录振动频谱。" for i in range(4)]
+    paragraphs[1] = "第1段：本段模拟提取失败，其余文本块的提取结果不受影响。"
+    result = asyncio.run(processor.process_text("\n\n".join(paragraphs)))
+
+    # 失败的块被跳过，其余结果保持原始顺序
+    assert _causes(result) == [paragraphs[0], paragraphs[2], paragraphs[3]]
+    assert len(result["chunk_spans"]) == 4
+
+
+def test_concurrency_limit_is_shared_across_requests(tmp_path, fake_llm):
+    processor = DocumentProcessor(max_context_length=60, max_concurrency=2, cache_dir=str(tmp_path))
+    texts = [
+        "\n\n".join(f"文档{n}第{i}段：滚动体表面出现点蚀，振动幅值升高，需要尽快安排停机检修。" for i in range(4))
+        for n in range(2)
+    ]
+
+    async def run():
+        return await asyncio.gather(*(processor.process_text(text) for text in texts))
+
+    results = asyncio.run(run())
+
+    assert [len(r["knowledge_graph"]) for r in results] == [4, 4]
+    assert fake_llm.max_in_flight == 2
+
+
+def test_process_text_uses_cache(processor, fake_llm):
+    text = "\n\n".join(f"第{i}段：保持架断裂导致滚动体卡滞，温度迅速升高，须立即停机检修。" for i in range(2))
+    first = asyncio.run(processor.process_text(text))
+    assert len(fake_llm.chunks) == 2
+
+    # 相同文本再次处理时全部命中缓存，不再调用LLM
+    second = asyncio.run(processor.process_text(text))
+    assert len(fake_llm.chunks) == 2
+    assert second["knowledge_graph"] == first["knowledge_graph"]
+
+    # 只有新增的文本块需要调用LLM
+    asyncio.run(processor.process_text(text + "\n\n新增段落：外圈滚道出现压痕，需要更换轴承并重新检查安装工艺。"))
+    assert fake_llm.chunks[2:] == ["新增段落：外圈滚道出现压痕，需要更换轴承并重新检查安装工艺。"]
+
+
+def test_failed_chunk_is_not_cached(processor, fake_llm):
+    text = "本段模拟提取失败。"
+    asyncio.run(processor.process_text(text))
+    asyncio.run(processor.process_text(text))
+    assert fake_llm.chunks == [text, text]
+
+
+def test_split_sentences_returns_spans_with_terminators(processor):
+    text = "前缀 轴承磨损。润滑不良！Why? end"
+    start = text.index("轴")
+    spans = processor._split_sentences(text, start, len(text))
+    assert [text[s:e].strip() for s, e in spans] == ["轴承磨损。", "润滑不良！", "Why?", "end"]
+
+
+def test_split_sentences_without_terminator_keeps_whole_range(processor):
+    text = "   "
+    assert processor._split_sentences(text, 0, len(text)) == [(0, len(text))]
+
+
+def test_short_text_is_single_span(processor):
+    text = "轴承磨损。"
+    assert processor._chunk_spans(text) == [(0, len(text))]
+
+
+def test_spans_respect_max_length_and_order(processor):
+    paragraphs = [f"第{i}段：轴承外圈出现疲劳剥落，需要检查润滑状态。" for i in range(10)]
+    text = "\n\n".join(paragraphs)
+    spans = processor._chunk_spans(text)
+
+    assert len(spans) > 1
+    for start, end in spans:
+        assert 0 <= start < end <= len(text)
+        assert end - start <= processor.max_context_length
+        # 块首尾不包含空白
+        assert text[start:end] == text[start:end].strip()
+    # 各块按顺序排列且互不重叠
+    for (_, prev_end), (next_start, _) in zip(spans, spans[1:]):
+        assert prev_end <= next_start
+    # 每个段落都完整地落在某个块中
+    for paragraph in paragraphs:
+        assert any(paragraph in text[start:end] for start, end in spans)
+
+
+def test_blank_lines_do_not_produce_chunks(processor):
+    text = "甲" * 50 + "\n\n\n\n   \n\n" + "乙" * 50 + "\n\n"
+    spans = processor._chunk_spans(text)
+    assert [text[start:end] for start, end in spans] == ["甲" * 50, "乙" * 50]
+
+
+def test_oversized_paragraph_is_split_by_sentences(processor):
+    sentence = "滚动体表面出现点蚀。"
+    paragraph = sentence * 20
+    text = "前言。\n\n" + paragraph
+    spans = processor._chunk_spans(text)
+
+    assert len(spans) > 1
+    for start, end in spans:
+        assert end - start <= processor.max_context_length
+        # 超长段落按句子边界切分
+        assert text[start:end].endswith("。")
+    assert "".join(text[start:end] for start, end in spans[1:]).endswith(paragraph[-30:])
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""知识图谱提取缓存测试"""
+
+import os
+
+from model.Structure_model import BearingFaultKnowledgeGraph
+from server.extraction_cache import ExtractionCache
+
+KG = BearingFaultKnowledgeGraph.model_validate({"entries": [{"cause": {"name": "润滑不良"}}]})
+
+
+def test_put_then_get_round_trip(tmp_path):
+    cache = ExtractionCache(str(tmp_path), "1")
+    assert cache.get("文本块", "model") is None
+    cache.put("文本块", "model", KG)
+    assert cache.get("文本块", "model") == KG
+
+
+def test_key_depends_on_model_and_prompt_version(tmp_path):
+    cache = ExtractionCache(str(tmp_path), "1")
+    cache.put("文本块", "model", KG)
+    assert cache.get("文本块", "other-model") is None
+    assert ExtractionCache(str(tmp_path), "2").get("文本块", "model") is None
+
+
+def test_invalid_entry_is_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path), "1")
+    path = cache._path("文本块", "model")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"entries": 5}')
+    assert cache.get("文本块", "model") is None
+    assert not os.path.exists(path)
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = ExtractionCache(str(tmp_path), "1")
+    with open(cache._path("乱码", "model"), "wb") as f:
+        f.write(b"\xff\xfe\x00")
+    os.mkdir(cache._path("目录", "model"))
+    assert cache.get("乱码", "model") is None
+    assert cache.get("目录", "model") is None
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""文档处理接口测试"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from router import process_router
+
+
+@pytest.fixture
+def client(monkeypatch, processor, fake_llm):
+    monkeypatch.setattr(process_router, "processor", processor)
+    app = FastAPI()
+    app.include_router(process_router.router)
+    return TestClient(app)
+
+
+def test_crlf_paragraphs_are_split(client):
+    paragraphs = [f"第{i}段：轴承内圈出现裂纹，振动信号中可见周期性冲击。" for i in range(6)]
+    body = "\r\n\r\n".join(paragraphs).encode("utf-8")
+    response = client.post("/process-document/", files={"file": ("doc.txt", body, "text/plain")})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "\r" not in data["text_content"]
+    assert len(data["chunk_spans"]) == 3
+    for start, end in data["chunk_spans"]:
+        assert end - start <= 60
+
+
+def test_chunk_spans_slice_text_content(client):
+    paragraphs = [f"第{i}段：润滑不良导致滚道磨损，包络谱中出现外圈特征频率，需复查。" for i in range(4)]
+    body = "\n\n".join(paragraphs).encode("utf-8")
+    response = client.post("/process-document/", files={"file": ("doc.md", body, "text/markdown")})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["filename"] == "doc.md"
+    assert "chunks" not in data
+    # 前端按位置从text_content中切出各文本块，与知识图谱结果一一对应
+    chunks = [data["text_content"][start:end] for start, end in data["chunk_spans"]]
+    assert chunks == paragraphs
+    assert [kg["entries"][0]["cause"]["name"] for kg in data["knowledge_graph"]] == paragraphs
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""JSON输出解析器测试"""
+
+import json
+
+from model.Structure_model import format_instructions, parser
+
+ANSWER = {"entries": [{"cause": {"name": "超负荷"}}]}
+ANSWER_JSON = json.dumps(ANSWER, ensure_ascii=False)
+
+
+def test_parse_plain_json():
+    kg = parser.parse(ANSWER_JSON)
+    assert kg.entries[0].cause["name"] == "超负荷"
+
+
+def test_parse_prose_wrapped_json():
+    kg = parser.parse(f"好的，提取结果如下：\n{ANSWER_JSON}\n以上。")
+    assert kg.entries[0].cause["name"] == "超负荷"
+
+
+def test_parse_skips_braces_and_objects_that_fail_validation():
+    # 模型先复述模式和无关对象，再给出答案
+    text = f"说明 {{注意}} 模式：{format_instructions}\n示例：{{\"a\": 1}}\n答案：{ANSWER_JSON}"
+    kg = parser.parse(text)
+    assert kg.entries[0].cause["name"] == "超负荷"
+
+
+def test_parse_finds_graph_nested_in_wrapper_object():
+    kg = parser.parse(f'结果：{{"result": {ANSWER_JSON}}}')
+    assert kg.entries[0].cause["name"] == "超负荷"
+
+
+def test_parse_schema_echo_alone_yields_no_graph():
+    assert parser.try_parse(f"模式：{format_instructions}") is None
+
+
+def test_parse_without_valid_json_returns_empty_graph():
+    assert parser.parse("无法提取 {").entries == []
+    assert parser.try_parse("无法提取 {") is None
+    assert parser.try_parse('{"entries": 5}') is None